@@ -38,25 +38,24 @@ class PollEventLoop(EventLoop):
     def _unregister(self, sock, objmap, flag):
         # If StreamWriter.awrite() wrote entire buf on 1st pass sock will never
         # have been registered. So test for presence in .flags.
-        if id(sock) in self.flags:
-            flags = self.flags[id(sock)]
-            if flags & flag:  # flag is currently registered
-                flags &= ~flag  # Clear current flag
-                if flags:  # Another flag is present
-                    self.flags[id(sock)] = flags
-                    self.poller.register(sock, flags)
-                else:
-                    del self.flags[id(sock)]  # Clear all flags
-                    self.poller.unregister(sock)
-                del objmap[id(sock)]  # Remove coro from appropriate dict
+        sid = id(sock)
+        flags = self.flags.get(sid, 0)  # Registered flags are never 0
+        if flags & flag:  # flag is currently registered
+            flags &= ~flag  # Clear current flag
+            if flags:  # Another flag is present
+                self.flags[sid] = flags
+                self.poller.register(sock, flags)
+            else:
+                del self.flags[sid]  # Clear all flags
+                self.poller.unregister(sock)
+            del objmap[sid]  # Remove coro from appropriate dict
 
     # Additively register sock for reading or writing
     def _register(self, sock, flag):
-        if id(sock) in self.flags:
-            self.flags[id(sock)] |= flag
-        else:
-            self.flags[id(sock)] = flag
-        self.poller.register(sock, self.flags[id(sock)])
+        sid = id(sock)
+        flags = self.flags.get(sid, 0) | flag
+        self.flags[sid] = flags
+        self.poller.register(sock, flags)
 
     def add_reader(self, sock, cb, *args):
         if DEBUG and __debug__:
@@ -101,14 +100,15 @@ class PollEventLoop(EventLoop):
         res = self.poller.ipoll(delay, 1)
         #log.debug("poll result: %s", res)
         for sock, ev in res:
+            sid = id(sock)
             if ev & select.POLLOUT:
-                cb = self.wrobjmap[id(sock)]
+                cb = self.wrobjmap[sid]
                 if cb is None:
                     continue  # Not yet ready.
                 # Invalidate objmap: can get adverse timing in fast_io whereby add_writer
                 # is not called soon enough. Ignore poll events occurring before we are
                 # ready to handle them.
-                self.wrobjmap[id(sock)] = None
+                self.wrobjmap[sid] = None
                 if ev & (select.POLLHUP | select.POLLERR):
                     # These events are returned even if not requested, and
                     # are sticky, i.e. will be returned again and again.
@@ -127,10 +127,10 @@ class PollEventLoop(EventLoop):
                         #cb.pend_throw(prev)
                     self._call_io(cb)  # Put coro onto runq (or ioq if one exists)
             if ev & select.POLLIN:
-                cb = self.rdobjmap[id(sock)]
+                cb = self.rdobjmap[sid]
                 if cb is None:
                     continue
-                self.rdobjmap[id(sock)] = None
+                self.rdobjmap[sid] = None
                 if ev & (select.POLLHUP | select.POLLERR):
                     # These events are returned even if not requested, and
                     # are sticky, i.e. will be returned again and again.
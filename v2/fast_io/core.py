@@ -17,7 +17,7 @@ import utimeq
 import ucollections
 
 
-type_gen = type((lambda: (yield))())
+type_gen = type((lambda: (yield))())  # Can't be subclassed so test with 'type(x) is type_gen'
 type_genf = type((lambda: (yield)))  # Type of a generator function upy iss #3241
 
 DEBUG = 0
@@ -57,6 +57,7 @@ class EventLoop:
         # in the event loop (sub-coroutines executed transparently by
         # yield from/await, event loop "doesn't see" them).
         self.cur_task = None
+        self._qentry = [0, 0, 0]  # Filled in place by utimeq.pop() in run_forever
 
     def time(self):
         return time.ticks_ms()
@@ -72,7 +73,7 @@ class EventLoop:
         if __debug__ and DEBUG:
             log.debug("Scheduling in ioq: %s", (callback, args))
         self.ioq.append(callback)
-        if not isinstance(callback, type_gen):
+        if type(callback) is not type_gen:
             self.ioq.append(args)
 
     def max_overdue_ms(self, t=None):
@@ -82,15 +83,17 @@ class EventLoop:
 
     # Low priority versions of call_later() call_later_ms() and call_at_()
     def call_after_ms(self, delay, callback, *args):
-        self.call_at_lp_(time.ticks_add(self.time(), delay), callback, *args)
+        self.call_at_lp_(time.ticks_add(time.ticks_ms(), delay), callback, args)
 
     def call_after(self, delay, callback, *args):
-        self.call_at_lp_(time.ticks_add(self.time(), int(delay * 1000)), callback, *args)
+        self.call_at_lp_(time.ticks_add(time.ticks_ms(), int(delay * 1000)), callback, args)
 
-    def call_at_lp_(self, time, callback, *args):
+    def call_at_lp_(self, time, callback, args=()):
         if self.lpq is not None:
+            if __debug__ and DEBUG:
+                log.debug("Scheduling in lpq: %s", (time, callback, args))
             self.lpq.push(time, callback, args)
-            if isinstance(callback, type_gen):
+            if type(callback) is type_gen:
                 callback.pend_throw(id(callback))
         else:
             raise OSError('No low priority queue exists.')
@@ -99,22 +102,22 @@ class EventLoop:
         if __debug__ and DEBUG:
             log.debug("Scheduling in runq: %s", (callback, args))
         self.runq.append(callback)
-        if not isinstance(callback, type_gen):
+        if type(callback) is not type_gen:
             self.runq.append(args)
 
     def call_later(self, delay, callback, *args):
-        self.call_at_(time.ticks_add(self.time(), int(delay * 1000)), callback, args)
+        self.call_at_(time.ticks_add(time.ticks_ms(), int(delay * 1000)), callback, args)
 
     def call_later_ms(self, delay, callback, *args):
         if not delay:
             return self.call_soon(callback, *args)
-        self.call_at_(time.ticks_add(self.time(), delay), callback, args)
+        self.call_at_(time.ticks_add(time.ticks_ms(), delay), callback, args)
 
     def call_at_(self, time, callback, args=()):
         if __debug__ and DEBUG:
             log.debug("Scheduling in waitq: %s", (time, callback, args))
         self.waitq.push(time, callback, args)
-        if isinstance(callback, type_gen):
+        if type(callback) is type_gen:
             callback.pend_throw(id(callback))
 
     def wait(self, delay):
@@ -125,140 +128,147 @@ class EventLoop:
         time.sleep_ms(delay)
 
     def run_forever(self):
-        cur_task = [0, 0, 0]
+        cur_task = self._qentry
+        # Bind loop invariants to locals: these are not reassigned after __init__.
+        # wait is bound here so a subclass override (e.g. PollEventLoop) is used.
+        runq = self.runq
+        waitq = self.waitq
+        lpq = self.lpq
+        ioq_len = self.ioq_len
+        ioq = self.ioq if ioq_len else None
+        canned = self.canned
+        wait = self.wait
+        debug = DEBUG  # Tested per tick. Call set_debug() before running the loop.
+        ticks_ms = time.ticks_ms  # Not self.time(): saves a Python method call per tick
+        ticks_diff = time.ticks_diff
         # Put a task on the runq unless it was cancelled
         def runq_add():
-            if isinstance(cur_task[1], type_gen):
-                tid = id(cur_task[1])
-                if tid in self.canned:
-                    self.canned.remove(tid)
+            _, cb, args = cur_task
+            if type(cb) is type_gen:
+                # Usually nothing is cancelled: skip id() (which can allocate) and the lookup
+                if canned and id(cb) in canned:
+                    canned.remove(id(cb))
                 else:
-                    cur_task[1].pend_throw(None)
-                    self.call_soon(cur_task[1], *cur_task[2])
-            else:
-                self.call_soon(cur_task[1], *cur_task[2])
+                    cb.pend_throw(None)
+                    runq.append(cb)
+            else:  # Reuse the args tuple popped from the queue: call_soon would repack it
+                runq.append(cb)
+                runq.append(args)
 
         while True:
             # Expire entries in waitq and move them to runq
-            tnow = self.time()
-            if self.lpq:
+            tnow = ticks_ms()
+            if lpq:
                 # Schedule a LP task if overdue or if no normal task is ready
-                to_run = False  # Assume no LP task is to run
-                t = self.lpq.peektime()
-                tim = time.ticks_diff(t, tnow)
-                to_run = self._max_od > 0 and tim < -self._max_od
-                if not (to_run or self.runq):  # No overdue LP task or task on runq
+                overdue = ticks_diff(tnow, lpq.peektime())  # > 0 if LP task is late
+                mx = self._max_od  # Not hoisted: max_overdue_ms() can change it at runtime
+                to_run = mx > 0 and overdue > mx  # Short-circuits in the usual mx == 0 case
+                if not (to_run or runq):  # No overdue LP task or task on runq
                     # zero delay tasks go straight to runq. So don't schedule LP if runq
-                    to_run = tim <= 0  # True if LP task is due
-                    if to_run and self.waitq:  # Set False if normal tasks due.
-                        t = self.waitq.peektime()
-                        to_run = time.ticks_diff(t, tnow) > 0 # No normal task is ready
+                    to_run = overdue >= 0  # True if LP task is due
+                    if to_run and waitq:  # Set False if normal tasks due.
+                        to_run = ticks_diff(waitq.peektime(), tnow) > 0 # No normal task is ready
                 if to_run:
-                    self.lpq.pop(cur_task)
+                    lpq.pop(cur_task)
                     runq_add()
 
-            while self.waitq:
-                t = self.waitq.peektime()
-                delay = time.ticks_diff(t, tnow)
+            while waitq:
+                t = waitq.peektime()
+                delay = ticks_diff(t, tnow)
                 if delay > 0:
                     break
-                self.waitq.pop(cur_task)
-                if __debug__ and DEBUG:
+                waitq.pop(cur_task)
+                if __debug__ and debug:
                     log.debug("Moving from waitq to runq: %s", cur_task[1])
                 runq_add()
 
             # Process runq. This can append tasks to the end of .runq so get initial
             # length so we only process those items on the queue at the start.
-            l = len(self.runq)
-            if __debug__ and DEBUG:
+            l = len(runq)
+            if __debug__ and debug:
                 log.debug("Entries in runq: %d", l)
-            cur_q = self.runq  # Default: always get tasks from runq
+            cur_q = runq  # Default: always get tasks from runq
             dl = 1  # Subtract this from entry count l
-            while l or self.ioq_len:
-                if self.ioq_len:  # Using fast_io
-                    self.wait(0)  # Schedule I/O. Can append to ioq.
-                    if self.ioq:
-                        cur_q = self.ioq
+            while l or ioq_len:
+                if ioq_len:  # Using fast_io
+                    wait(0)  # Schedule I/O. Can append to ioq.
+                    if ioq:
+                        cur_q = ioq
                         dl = 0  # No effect on l
                     elif l == 0:
                         break  # Both queues are empty
                     else:
-                        cur_q = self.runq
+                        cur_q = runq
                         dl = 1
                 l -= dl
                 cb = cur_q.popleft()  # Remove most current task
-                args = ()
-                if not isinstance(cb, type_gen):  # It's a callback not a generator so get args
+                if type(cb) is not type_gen:  # It's a callback not a generator so get args
                     args = cur_q.popleft()
                     l -= dl
-                    if __debug__ and DEBUG:
+                    if __debug__ and debug:
                         log.info("Next callback to run: %s", (cb, args))
                     cb(*args)  # Call it
                     continue  # Proceed to next runq entry
 
-                if __debug__ and DEBUG:
-                    log.info("Next coroutine to run: %s", (cb, args))
+                if __debug__ and debug:
+                    log.info("Next coroutine to run: %s", cb)
                 self.cur_task = cb  # Stored in a bound variable for TimeoutObj
                 delay = 0
                 low_priority = False  # Assume normal priority
+                # Guard only the resume: continue statements in the dispatch below
+                # are then plain jumps with no exception block to unwind.
                 try:
-                    if args is ():
-                        ret = next(cb)  # Schedule the coro, get result
-                    else:
-                        ret = cb.send(*args)
-                    if __debug__ and DEBUG:
-                        log.info("Coroutine %s yield result: %s", cb, ret)
-                    if isinstance(ret, SysCall1):  # Coro returned a SysCall1: an object with an arg spcified in its constructor
-                        arg = ret.arg
-                        if isinstance(ret, SleepMs):
-                            delay = arg
-                            if isinstance(ret, AfterMs):
-                                low_priority = True
-                                if isinstance(ret, After):
-                                    delay = int(delay*1000)
-                        elif isinstance(ret, IORead):  # coro was a StreamReader read method
-                            cb.pend_throw(False)  # Marks the task as waiting on I/O for cancellation/timeout
-                            # If task is cancelled or times out, it is put on runq to process exception.
-                            # Debug note: if task is scheduled other than by wait (which does pend_throw(None) 
-                            # an exception (exception doesn't inherit from Exception) is thrown
-                            self.add_reader(arg, cb)  # Set up select.poll for read and store the coro in object map
-                            continue  # Don't reschedule. Coro is scheduled by wait() when poll indicates h/w ready
-                        elif isinstance(ret, IOWrite):  # coro was StreamWriter.awrite. Above comments apply.
-                            cb.pend_throw(False)
-                            self.add_writer(arg, cb)
-                            continue
-                        elif isinstance(ret, IOReadDone):  # update select.poll registration and if necessary remove coro from map
-                            self.remove_reader(arg)
-                            self._call_io(cb, args)  # Next call produces StopIteration enabling result to be returned
-                            continue
-                        elif isinstance(ret, IOWriteDone):
-                            self.remove_writer(arg)
-                            self._call_io(cb, args)  # Next call produces StopIteration: see StreamWriter.aclose
-                            continue 
-                        elif isinstance(ret, StopLoop):  # e.g. from run_until_complete. run_forever() terminates
-                            return arg
-                        else:
-                            assert False, "Unknown syscall yielded: %r (of type %r)" % (ret, type(ret))
-                    elif isinstance(ret, type_gen):  # coro has yielded a coro (or generator)
-                        self.call_soon(ret)  # append to .runq
-                    elif isinstance(ret, int):  # If coro issued yield N, delay = N ms
-                        delay = ret
-                    elif ret is None:
-                        # coro issued yield. delay == 0 so code below will put the current task back on runq
-                        pass
-                    elif ret is False:
-                        # yield False causes coro not to be rescheduled i.e. it stops.
-                        continue
-                    else:
-                        assert False, "Unsupported coroutine yield value: %r (of type %r)" % (ret, type(ret))
+                    # Coros are queued without args (see call_soon) so there is nothing to send
+                    ret = next(cb)  # Schedule the coro, get result
                 except StopIteration as e:
-                    if __debug__ and DEBUG:
+                    if __debug__ and debug:
                         log.debug("Coroutine finished: %s", cb)
                     continue
                 except CancelledError as e:
-                    if __debug__ and DEBUG:
+                    if __debug__ and debug:
                         log.debug("Coroutine cancelled: %s", cb)
                     continue
+                if __debug__ and debug:
+                    log.info("Coroutine %s yield result: %s", cb, ret)
+                op = getattr(ret, '_syscall_op', 0)  # Nonzero for SysCall1 instances: see SysCall
+                if op:  # Coro returned a SysCall1: an object with an arg spcified in its constructor
+                    arg = ret.arg
+                    if op & 1:  # SleepMs or a low priority subclass
+                        delay = int(arg * 1000) if op & 4 else arg
+                        low_priority = op & 2
+                    elif op == 8:  # IORead: coro was a StreamReader read method
+                        cb.pend_throw(False)  # Marks the task as waiting on I/O for cancellation/timeout
+                        # If task is cancelled or times out, it is put on runq to process exception.
+                        # Debug note: if task is scheduled other than by wait (which does pend_throw(None) 
+                        # an exception (exception doesn't inherit from Exception) is thrown
+                        self.add_reader(arg, cb)  # Set up select.poll for read and store the coro in object map
+                        continue  # Don't reschedule. Coro is scheduled by wait() when poll indicates h/w ready
+                    elif op == 10:  # IOWrite: coro was StreamWriter.awrite. Above comments apply.
+                        cb.pend_throw(False)
+                        self.add_writer(arg, cb)
+                        continue
+                    elif op == 12:  # IOReadDone: update select.poll registration and if necessary remove coro from map
+                        self.remove_reader(arg)
+                        self._call_io(cb)  # Next call produces StopIteration enabling result to be returned
+                        continue
+                    elif op == 14:  # IOWriteDone
+                        self.remove_writer(arg)
+                        self._call_io(cb)  # Next call produces StopIteration: see StreamWriter.aclose
+                        continue 
+                    else:  # StopLoop e.g. from run_until_complete. run_forever() terminates
+                        return arg
+                elif type(ret) is type_gen:  # coro has yielded a coro (or generator)
+                    self.call_soon(ret)  # append to .runq
+                elif isinstance(ret, int):  # If coro issued yield N, delay = N ms
+                    delay = ret
+                elif ret is None:
+                    # coro issued yield. delay == 0 so code below will put the current task back on runq
+                    pass
+                elif ret is False:
+                    # yield False causes coro not to be rescheduled i.e. it stops.
+                    continue
+                else:
+                    assert False, "Unsupported coroutine yield value: %r (of type %r)" % (ret, type(ret))
                 # Currently all syscalls don't return anything, so we don't
                 # need to feed anything to the next invocation of coroutine.
                 # If that changes, need to pass that value below.
@@ -271,22 +281,22 @@ class EventLoop:
 
             # Wait until next waitq task or I/O availability
             delay = 0
-            if not self.runq:
+            if not runq:
                 delay = -1
-                if self.waitq:
-                    tnow = self.time()
-                    t = self.waitq.peektime()
-                    delay = time.ticks_diff(t, tnow)
+                if waitq:
+                    tnow = ticks_ms()
+                    t = waitq.peektime()
+                    delay = ticks_diff(t, tnow)
                     if delay < 0:
                         delay = 0
-                if self.lpq:
-                    t = self.lpq.peektime()
-                    lpdelay = time.ticks_diff(t, tnow)
+                if lpq:
+                    t = lpq.peektime()
+                    lpdelay = ticks_diff(t, tnow)
                     if lpdelay < 0:
                         lpdelay = 0
                     if lpdelay < delay or delay < 0:
                         delay = lpdelay  # waitq is empty or lp task is more current
-            self.wait(delay)
+            wait(delay)
 
     def run_until_complete(self, coro):
         assert not isinstance(coro, type_genf), 'Coroutine arg expected.'  # upy issue #3241
@@ -304,6 +314,9 @@ class EventLoop:
 
 
 class SysCall:
+    # Opcode dispatched on by run_forever. Bit 0 is set for sleeps, in which case
+    # bit 1 denotes low priority and bit 2 a delay in seconds. Unknown syscalls are 0.
+    _syscall_op = 0
 
     def __init__(self, *args):
         self.args = args
@@ -318,19 +331,19 @@ class SysCall1(SysCall):
         self.arg = arg
 
 class StopLoop(SysCall1):
-    pass
+    _syscall_op = 16
 
 class IORead(SysCall1):
-    pass
+    _syscall_op = 8
 
 class IOWrite(SysCall1):
-    pass
+    _syscall_op = 10
 
 class IOReadDone(SysCall1):
-    pass
+    _syscall_op = 12
 
 class IOWriteDone(SysCall1):
-    pass
+    _syscall_op = 14
 
 
 _event_loop = None
@@ -355,6 +368,7 @@ def sleep(secs):
 
 # Implementation of sleep_ms awaitable with zero heap memory usage
 class SleepMs(SysCall1):
+    _syscall_op = 1
 
     def __init__(self):
         self.v = None
@@ -370,9 +384,10 @@ class SleepMs(SysCall1):
         return self
 
     def __next__(self):
-        if self.v is not None:
+        v = self.v  # Read the attribute once
+        if v is not None:
             #print("__next__ syscall enter")
-            self.arg = self.v
+            self.arg = v
             self.v = None
             return self
         #print("__next__ syscall exit")
@@ -437,10 +452,10 @@ def coroutine(f):
 
 # Low priority
 class AfterMs(SleepMs):
-    pass
+    _syscall_op = 3
 
 class After(AfterMs):
-    pass
+    _syscall_op = 7
 
 after_ms = AfterMs()
 after = After()